@@ -16,32 +16,849 @@ if sys.platform == 'win32':
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
 import requests
+import yaml
 import json
+import math
+import re
+import threading
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+
+# 모델별 OpenAI 요금 (USD / 1M 토큰)
+MODEL_PRICING = {
+    "gpt-4o": {"prompt": 2.50, "completion": 10.00},
+    "gpt-4o-mini": {"prompt": 0.15, "completion": 0.60},
+}
+DEFAULT_MODEL = "gpt-4o"
+DEFAULT_MAX_TOKENS = 100
+
+# 서버가 OpenAI 호출 시 포함하는 최근 대화 턴 수 (user + ai 한 쌍 = 1턴)
+HISTORY_TURNS = 5
+
+# 테스트 중 주기적으로 수집할 서버 지표 (Spring Boot Actuator)
+DEFAULT_METRICS_ENDPOINTS = [
+    "/actuator/metrics/jvm.memory.used?tag=area:heap",
+    "/actuator/metrics/http.server.requests?tag=uri:/api/conversations/messages",
+    "/actuator/metrics/hikaricp.connections.active",
+    "/actuator/metrics/hikaricp.connections.pending",
+]
+DEFAULT_METRICS_INTERVAL = 5.0
+
+# 서버 시작 후 누적되는 Micrometer 카운터 (서버 재시작 시 0부터 다시 시작)
+COUNTER_STATISTICS = ["COUNT", "TOTAL_TIME"]
+
+# 서버 장애 감지 (Circuit Breaker)
+FAILURE_THRESHOLD = 3         # 연속 실패 횟수가 이 값에 도달하면 요청 차단
+RECOVERY_TIMEOUT = 300.0      # 서버 복구 대기 최대 시간 (초)
+HEALTH_BACKOFF_INITIAL = 1.0  # 헬스 체크 첫 대기 시간 (초)
+HEALTH_BACKOFF_MAX = 15.0     # 헬스 체크 최대 대기 시간 (초)
+CONNECT_TIMEOUT = 5           # 연결 타임아웃 (초), 응답 대기 타임아웃과 별도
+MAX_SCENARIO_RETRIES = 2      # 서버 복구 후 시나리오 재시도 횟수
+
+# 스트리밍 응답 읽기 단위 (바이트). chunked가 아닌 응답(Connection: close)도
+# 도착하는 즉시 읽어 TTFB/TTFT를 측정하기 위해 1바이트씩 읽음
+STREAM_READ_SIZE = 1
+
+# OpenAI Chat 포맷의 메시지당 오버헤드 토큰 및 응답 프라이밍 토큰
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REPLY = 3
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    텍스트의 토큰 수 추정 (tokenizer 없이 사용하는 근사치)
+
+    한글은 음절당 약 1토큰, 그 외 문자는 약 4자당 1토큰으로 계산합니다.
+
+    Args:
+        text: 대상 텍스트
+
+    Returns:
+        int: 추정 토큰 수
+    """
+    if not text:
+        return 0
+
+    hangul = len(re.findall(r'[가-힣]', text))
+    others = len(re.sub(r'[가-힣\s]', '', text))
+
+    return hangul + math.ceil(others / 4)
+
+
+def estimate_prompt_tokens(system_prompt: str, history: List[tuple], message: str,
+                           max_reply_tokens: Optional[int] = None) -> int:
+    """
+    서버가 OpenAI로 보내는 프롬프트 토큰 수 추정
+
+    시스템 프롬프트 + 최근 HISTORY_TURNS 턴의 대화 + 현재 사용자 메시지로 구성됩니다.
+
+    Args:
+        system_prompt: 설정의 시스템 프롬프트
+        history: (사용자 메시지, AI 응답) 튜플 목록
+        message: 현재 사용자 메시지
+        max_reply_tokens: 이전 AI 응답의 토큰 상한 (설정의 max-tokens, None이면 제한 없음)
+
+    Returns:
+        int: 추정 프롬프트 토큰 수
+    """
+    tokens = TOKENS_PER_REPLY
+    tokens += TOKENS_PER_MESSAGE + estimate_tokens(system_prompt)
+
+    for user_text, ai_text in history[-HISTORY_TURNS:]:
+        tokens += TOKENS_PER_MESSAGE + estimate_tokens(user_text)
+        ai_tokens = estimate_tokens(ai_text)
+        if max_reply_tokens is not None:
+            ai_tokens = min(ai_tokens, max_reply_tokens)
+        tokens += TOKENS_PER_MESSAGE + ai_tokens
+
+    tokens += TOKENS_PER_MESSAGE + estimate_tokens(message)
+
+    return tokens
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    백분위수 계산 (nearest-rank 방식)
+
+    Args:
+        values: 값 목록
+        pct: 백분위 (0-100)
+
+    Returns:
+        float: 백분위수 (값이 없으면 0)
+    """
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+
+    return ordered[rank - 1]
+
+
+def parse_sse_event(raw: str) -> Optional[str]:
+    """
+    SSE 이벤트 블록에서 data 필드 추출
+
+    Args:
+        raw: 빈 줄로 구분된 이벤트 블록
+
+    Returns:
+        Optional[str]: data 값 (주석/keep-alive 이벤트면 None)
+    """
+    data_lines = []
+
+    for line in raw.splitlines():
+        if line.startswith("data:"):
+            value = line[5:]
+            data_lines.append(value[1:] if value.startswith(" ") else value)
+
+    if not data_lines:
+        return None
+
+    return "\n".join(data_lines)
+
+
+def decode_sse_event(raw: str) -> Optional[Dict[str, Any]]:
+    """
+    SSE 이벤트 블록을 응답 조각 또는 최종 응답으로 변환
+
+    Args:
+        raw: 빈 줄로 구분된 이벤트 블록
+
+    Returns:
+        Optional[Dict]: {"content": 응답 조각} 또는 {"final": 최종 응답 데이터}
+                        (keep-alive, [DONE], 빈 조각이면 None)
+    """
+    event_data = parse_sse_event(raw)
+
+    if event_data is None or event_data == "[DONE]":
+        return None
+
+    try:
+        event = json.loads(event_data)
+    except ValueError:
+        event = event_data
+
+    # JSON 객체가 아닌 값(숫자, true, null, 문자열 등)은 원문 그대로 응답 조각으로 취급
+    if not isinstance(event, dict):
+        return {"content": event_data}
+
+    if "aiMessage" in event or isinstance(event.get("data"), dict):
+        return {"final": event.get("data", event)}
+
+    if event.get("content") not in (None, ""):
+        return {"content": str(event["content"])}
+
+    return None
+
+
+def counter_increase(series: List[float]) -> float:
+    """
+    누적 카운터의 구간 증가량 계산 (카운터 리셋 고려)
+
+    값이 감소하면 서버 재시작으로 카운터가 0부터 다시 시작한 것으로 보고
+    차이 대신 새 값을 더합니다.
+
+    Args:
+        series: 시간순 카운터 값 목록
+
+    Returns:
+        float: 증가량 합계
+    """
+    increase = 0.0
+
+    for previous, current in zip(series, series[1:]):
+        increase += current - previous if current >= previous else current
+
+    return increase
+
+
+def estimate_cost(prompt_tokens: int, completion_tokens: int, model: str) -> float:
+    """
+    토큰 수로 OpenAI 비용 추정
+
+    Args:
+        prompt_tokens: 프롬프트 토큰 수
+        completion_tokens: 응답 토큰 수
+        model: 모델 이름
+
+    Returns:
+        float: 추정 비용 (USD)
+    """
+    pricing = MODEL_PRICING.get(model, MODEL_PRICING[DEFAULT_MODEL])
+    return (prompt_tokens * pricing["prompt"] + completion_tokens * pricing["completion"]) / 1_000_000
+
+
+class BudgetScheduler:
+    """토큰/비용 예산 기반 테스트 셀(설정 × 시나리오) 스케줄러"""
+
+    def __init__(self, token_budget: Optional[int] = None, cost_budget: Optional[float] = None):
+        """
+        초기화
+
+        Args:
+            token_budget: 전체 토큰 예산 (None이면 제한 없음)
+            cost_budget: 전체 비용 예산 USD (None이면 제한 없음)
+        """
+        self.token_budget = token_budget
+        self.cost_budget = cost_budget
+        self.spent_tokens = 0
+        self.spent_cost = 0.0
+        self.exhausted = False
+        self.skipped = []
+
+    @property
+    def enabled(self) -> bool:
+        """예산 제한 사용 여부"""
+        return self.token_budget is not None or self.cost_budget is not None
+
+    def estimate_cell(self, scenario: Dict[str, Any], profile: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        시나리오 1회 실행 비용 추정 (응답은 max-tokens 상한으로 가정)
+
+        Args:
+            scenario: 시나리오 정보
+            profile: 설정의 프롬프트/파라미터 정보
+
+        Returns:
+            Dict: 추정 토큰 및 비용
+        """
+        messages = [msg["message"] for msg in scenario["context"] if msg["role"] == "user"]
+        messages.append(scenario["user_message"])
+
+        prompt_tokens = 0
+        completion_tokens = 0
+        turn_tokens = []  # 턴별 (사용자 메시지 + AI 응답) 토큰 수
+
+        for message in messages:
+            prompt_tokens += estimate_prompt_tokens(profile["system_prompt"], [], message)
+            prompt_tokens += sum(turn_tokens[-HISTORY_TURNS:])
+            completion_tokens += profile["max_tokens"]
+            turn_tokens.append(2 * TOKENS_PER_MESSAGE + estimate_tokens(message) + profile["max_tokens"])
+
+        return {
+            "total_tokens": prompt_tokens + completion_tokens,
+            "cost_usd": estimate_cost(prompt_tokens, completion_tokens, profile["model"])
+        }
+
+    def prioritize(self, scenarios: List[Dict[str, Any]], profile: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        남은 시나리오를 추정 비용이 낮은 순으로 정렬
+
+        예산이 부족할 때 가능한 많은 셀을 완료하기 위함입니다.
+        예산 제한이 없으면 원래 순서를 유지합니다.
+
+        Args:
+            scenarios: 시나리오 목록
+            profile: 설정의 프롬프트/파라미터 정보
+
+        Returns:
+            List[Dict]: 정렬된 시나리오 목록
+        """
+        if not self.enabled:
+            return scenarios
+
+        return sorted(scenarios, key=lambda s: self.estimate_cell(s, profile)["total_tokens"])
+
+    def can_afford(self, estimate: Dict[str, Any]) -> bool:
+        """
+        추정 비용이 남은 예산 안에 들어오는지 확인
+
+        Args:
+            estimate: estimate_cell() 결과
+
+        Returns:
+            bool: 실행 가능 여부
+        """
+        if self.token_budget is not None and self.spent_tokens + estimate["total_tokens"] > self.token_budget:
+            return False
+        if self.cost_budget is not None and self.spent_cost + estimate["cost_usd"] > self.cost_budget:
+            return False
+        return True
+
+    def charge(self, usage: Dict[str, Any]) -> None:
+        """
+        실제 사용량 차감
+
+        Args:
+            usage: 요청 사용량 (total_tokens, cost_usd)
+        """
+        self.spent_tokens += usage["total_tokens"]
+        self.spent_cost += usage["cost_usd"]
+
+    def skip(self, config_name: str, scenario: Dict[str, Any]) -> None:
+        """
+        예산 부족으로 건너뛴 셀 기록
+
+        Args:
+            config_name: 설정 이름
+            scenario: 시나리오 정보
+        """
+        self.exhausted = True
+        self.skipped.append({"config_name": config_name, "scenario_id": scenario["id"]})
+
+    def summary(self) -> Dict[str, Any]:
+        """예산 사용 요약"""
+        return {
+            "token_budget": self.token_budget,
+            "cost_budget_usd": self.cost_budget,
+            "spent_tokens": self.spent_tokens,
+            "spent_cost_usd": round(self.spent_cost, 6),
+            "exhausted": self.exhausted,
+            "skipped_cells": self.skipped
+        }
+
+
+class CircuitOpenError(Exception):
+    """서버 장애로 Circuit Breaker가 열려 요청을 보내지 않은 경우"""
+
+
+class CircuitBreaker:
+    """
+    HTTP 요청 Circuit Breaker
+
+    연결 실패, 타임아웃, 5xx 응답이 연속으로 발생하면 열림(open) 상태가 되어
+    요청을 즉시 거부합니다. wait_until_healthy()로 /actuator/health를 백오프하며
+    확인하고, 서버가 정상으로 돌아오면 닫힘(closed) 상태로 복귀합니다.
+    """
+
+    def __init__(self, base_url: str, failure_threshold: int = FAILURE_THRESHOLD,
+                 recovery_timeout: float = RECOVERY_TIMEOUT):
+        """
+        초기화
+
+        Args:
+            base_url: MARUNI 서버 URL
+            failure_threshold: 차단까지의 연속 실패 횟수
+            recovery_timeout: 서버 복구 대기 최대 시간 (초)
+        """
+        self.base_url = base_url
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.consecutive_failures = 0
+        self.last_failure = None  # 직전 실패 종류 ("connection" 또는 "http_5xx")
+        self.is_open = False
+        self.opened_at = None
+        self.outages = []
+        self.current_outage = None
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Circuit Breaker를 거쳐 HTTP 요청 전송
+
+        Args:
+            method: HTTP 메서드
+            url: 요청 URL
+            **kwargs: requests.request() 인자
+
+        Returns:
+            requests.Response: 응답
+
+        Raises:
+            CircuitOpenError: 차단 상태라 요청을 보내지 않은 경우
+            requests.RequestException: 연결 실패/타임아웃
+        """
+        if self.is_open:
+            raise CircuitOpenError("서버 장애로 요청이 차단되었습니다")
+
+        try:
+            response = requests.request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            self.record_failure("connection")
+            raise
+
+        if response.status_code >= 500:
+            self.record_failure("http_5xx")
+        else:
+            self.record_success()
+
+        return response
+
+    def record_failure(self, kind: str = "connection") -> None:
+        """
+        실패 기록 (임계치 도달 시 차단)
+
+        Args:
+            kind: 실패 종류 ("connection": 연결 실패/타임아웃, "http_5xx": 5xx 응답)
+        """
+        self.consecutive_failures += 1
+        self.last_failure = kind
+
+        if not self.is_open and self.consecutive_failures >= self.failure_threshold:
+            self.open()
+            print(f"\n🔌 서버 장애 감지: 연속 {self.consecutive_failures}회 실패, 요청을 중단합니다.")
+
+    def open(self) -> None:
+        """차단 처리 (장애 기록 시작, 복구 시 close()에서 종료)"""
+        self.is_open = True
+        self.opened_at = time.time()
+        self.current_outage = {
+            "opened_at": datetime.fromtimestamp(self.opened_at).isoformat(),
+            "closed_at": None,
+            "downtime_s": 0.0,
+            "probes": 0
+        }
+        self.outages.append(self.current_outage)
+
+    def record_success(self) -> None:
+        """성공 기록 (연속 실패 횟수 초기화)"""
+        self.consecutive_failures = 0
+        self.last_failure = None
+
+    def should_retry(self) -> bool:
+        """
+        직전 실패가 복구 후 재시도할 만한 서버 장애인지 확인
+
+        연결 실패/타임아웃이거나 헬스 체크가 실패하면 True입니다.
+        서버가 정상인데 5xx를 반환하는 경우는 재시도해도 같은 오류로 토큰만 소모하므로 False입니다.
+
+        Returns:
+            bool: 재시도 여부
+        """
+        if self.consecutive_failures == 0:
+            return False
+
+        if self.last_failure == "connection":
+            return True
+
+        return not self.check_health()
+
+    def check_health(self) -> bool:
+        """
+        /actuator/health 1회 확인
+
+        Returns:
+            bool: 서버 정상 여부
+        """
+        try:
+            response = requests.get(f"{self.base_url}/actuator/health", timeout=CONNECT_TIMEOUT)
+            return response.status_code == 200
+        except requests.RequestException:
+            return False
+
+    def wait_until_healthy(self) -> bool:
+        """
+        서버가 정상으로 돌아올 때까지 백오프하며 대기
+
+        닫힘 상태여도 헬스 체크가 실패하면 차단 후 대기합니다 (서버 재시작 직후 등).
+
+        Returns:
+            bool: 복구 여부 (recovery_timeout 초과 시 False)
+        """
+        if self.check_health():
+            if self.is_open:
+                self.close(probes=1)
+            return True
+
+        if not self.is_open:
+            self.open()
+
+        print(f"⏳ 서버 복구 대기 중... (최대 {self.recovery_timeout:.0f}초)")
+
+        delay = HEALTH_BACKOFF_INITIAL
+        probes = 1
+        deadline = time.time() + self.recovery_timeout
+
+        while time.time() < deadline:
+            time.sleep(min(delay, max(0.0, deadline - time.time())))
+            probes += 1
+
+            if self.check_health():
+                self.close(probes)
+                return True
+
+            delay = min(delay * 2, HEALTH_BACKOFF_MAX)
+
+        print(f"❌ {self.recovery_timeout:.0f}초 동안 서버가 복구되지 않았습니다.")
+        # 같은 장애가 계속되는 중이므로 기존 기록만 갱신
+        self.current_outage["downtime_s"] = round(time.time() - self.opened_at, 1)
+        self.current_outage["probes"] += probes
+
+        return False
+
+    def close(self, probes: int) -> None:
+        """
+        복구 처리 (차단 해제 및 장애 기록)
+
+        Args:
+            probes: 복구까지 수행한 헬스 체크 횟수
+        """
+        downtime = time.time() - self.opened_at
+        self.current_outage["closed_at"] = datetime.now().isoformat()
+        self.current_outage["downtime_s"] = round(downtime, 1)
+        self.current_outage["probes"] += probes
+
+        self.is_open = False
+        self.opened_at = None
+        self.current_outage = None
+        self.consecutive_failures = 0
+        self.last_failure = None
+        print(f"✅ 서버 복구 확인 ({downtime:.1f}초 후), 테스트를 재개합니다.")
+
+
+class MetricsSampler:
+    """테스트 실행 중 서버 Actuator 지표를 일정 간격으로 수집하는 백그라운드 샘플러"""
+
+    def __init__(self, base_url: str, endpoints: List[str], interval: float = DEFAULT_METRICS_INTERVAL):
+        """
+        초기화
+
+        Args:
+            base_url: MARUNI 서버 URL
+            endpoints: 수집할 Actuator 경로 목록
+            interval: 수집 간격 (초)
+        """
+        self.base_url = base_url
+        self.endpoints = endpoints
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        """수집 시작"""
+        self.samples = []
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> List[Dict[str, Any]]:
+        """
+        수집 중지 (마지막 샘플 1회 수집 후 종료)
+
+        Returns:
+            List[Dict]: 수집된 샘플 목록
+        """
+        if self._thread is None:
+            return self.samples
+
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        self.samples.append(self.sample())
+
+        return self.samples
+
+    def _run(self) -> None:
+        """수집 루프 (stop() 호출 시까지 interval마다 반복)"""
+        while True:
+            self.samples.append(self.sample())
+            if self._stop_event.wait(self.interval):
+                break
+
+    def sample(self) -> Dict[str, Any]:
+        """
+        모든 엔드포인트 1회 조회
+
+        Returns:
+            Dict: 샘플 (시각, 엔드포인트별 statistic 값 또는 오류)
+        """
+        sample = {
+            "timestamp": datetime.now().isoformat(),
+            "epoch": time.time(),
+            "metrics": {}
+        }
+
+        for endpoint in self.endpoints:
+            try:
+                response = requests.get(
+                    f"{self.base_url}{endpoint}",
+                    timeout=min(self.interval, 5)
+                )
+
+                if response.status_code == 200:
+                    measurements = response.json().get("measurements", [])
+                    sample["metrics"][endpoint] = {
+                        m["statistic"]: m["value"] for m in measurements
+                    }
+                else:
+                    sample["metrics"][endpoint] = {"error": f"HTTP {response.status_code}"}
+
+            except Exception as e:
+                sample["metrics"][endpoint] = {"error": str(e)}
+
+        return sample
+
+    @staticmethod
+    def summarize(samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        엔드포인트/statistic별 최소, 최대, 마지막 값, 변화량 집계
+
+        Timer 지표(COUNT, TOTAL_TIME)가 있으면 수집 구간의 평균 처리 시간도 계산합니다.
+        누적 카운터는 지표가 아직 없는 샘플(해당 URI 미호출 시 404)을 0으로 보고,
+        서버 재시작으로 값이 감소하면 리셋으로 처리하여 구간별 증가량을 합산합니다.
+
+        Args:
+            samples: 수집된 샘플 목록
+
+        Returns:
+            Dict: 엔드포인트별 집계
+        """
+        summary = {}
+        endpoints = []
+        for sample in samples:
+            for endpoint in sample["metrics"]:
+                if endpoint not in endpoints:
+                    endpoints.append(endpoint)
+
+        for endpoint in endpoints:
+            values = [s["metrics"][endpoint] for s in samples
+                      if endpoint in s["metrics"] and "error" not in s["metrics"][endpoint]]
+            errors = sum(1 for s in samples if "error" in s["metrics"].get(endpoint, {}))
+
+            stats = {}
+            for statistic in (values[0].keys() if values else []):
+                if statistic in COUNTER_STATISTICS:
+                    series = []
+                    for sample in samples:
+                        metric = sample["metrics"].get(endpoint, {})
+                        if metric.get("error") == "HTTP 404":
+                            series.append(0.0)
+                        elif statistic in metric:
+                            series.append(metric[statistic])
+                    delta = counter_increase(series)
+                else:
+                    series = [v[statistic] for v in values if statistic in v]
+                    delta = series[-1] - series[0]
+
+                stats[statistic] = {
+                    "min": min(series),
+                    "max": max(series),
+                    "last": series[-1],
+                    "delta": delta
+                }
+
+            entry = {"samples": len(values), "errors": errors, "statistics": stats}
+
+            if "COUNT" in stats and "TOTAL_TIME" in stats and stats["COUNT"]["delta"] > 0:
+                entry["avg_time_ms"] = round(
+                    stats["TOTAL_TIME"]["delta"] / stats["COUNT"]["delta"] * 1000, 1
+                )
+
+            summary[endpoint] = entry
+
+        return summary
 
 
 class AIResponseComparisonTest:
     """AI 응답 개선 비교 테스트 자동화 클래스"""
 
-    def __init__(self, base_url: str = "http://localhost:8080"):
+    def __init__(self, base_url: str = "http://localhost:8080",
+                 token_budget: Optional[int] = None, cost_budget: Optional[float] = None,
+                 stream: bool = False, metrics_endpoints: Optional[List[str]] = None,
+                 metrics_interval: float = DEFAULT_METRICS_INTERVAL,
+                 recovery_timeout: float = RECOVERY_TIMEOUT):
         """
         초기화
 
         Args:
             base_url: MARUNI 서버 URL (기본값: http://localhost:8080)
+            token_budget: 전체 토큰 예산 (기본값: 제한 없음)
+            cost_budget: 전체 비용 예산 USD (기본값: 제한 없음)
+            stream: 스트리밍 응답 모드 사용 여부 (기본값: False)
+            metrics_endpoints: 수집할 Actuator 경로 목록 (기본값: DEFAULT_METRICS_ENDPOINTS)
+            metrics_interval: 서버 지표 수집 간격 초 (0 이하이면 수집 안 함)
+            recovery_timeout: 서버 장애 시 복구 대기 최대 시간 초
         """
         self.base_url = base_url
+        self.stream = stream
+        self.breaker = CircuitBreaker(base_url, recovery_timeout=recovery_timeout)
+        self.metrics_sampler = None
+        if metrics_interval > 0:
+            self.metrics_sampler = MetricsSampler(
+                base_url,
+                metrics_endpoints or DEFAULT_METRICS_ENDPOINTS,
+                metrics_interval
+            )
         self.access_token = None
         self.current_user_id = None
+        self.scheduler = BudgetScheduler(token_budget, cost_budget)
+        self.profile = self.load_profile_settings({})
+        self.conversation_history = []  # (사용자 메시지, AI 응답) 튜플 목록
+        self.request_usage = []
         self.results = {
             "test_date": datetime.now().isoformat(),
             "base_url": base_url,
+            "response_mode": "stream" if stream else "blocking",
             "configurations": []
         }
 
+    def load_profile_settings(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        설정 파일에서 토큰 추정에 필요한 모델/파라미터/시스템 프롬프트 로드
+
+        Args:
+            config: 설정 정보 (config_file, max_tokens 키 선택)
+
+        Returns:
+            Dict: 모델, max-tokens, 시스템 프롬프트
+        """
+        profile = {
+            "model": DEFAULT_MODEL,
+            "max_tokens": DEFAULT_MAX_TOKENS,
+            "system_prompt": "",
+            "source": None
+        }
+
+        config_file = config.get("config_file")
+        if config_file:
+            path = Path(__file__).parent / config_file
+
+            try:
+                with open(path, encoding="utf-8") as f:
+                    settings = yaml.safe_load(f) or {}
+
+                options = settings.get("spring", {}).get("ai", {}).get("openai", {}) \
+                    .get("chat", {}).get("options", {})
+                ai = settings.get("maruni", {}).get("conversation", {}).get("ai", {})
+
+                profile["model"] = options.get("model", profile["model"])
+                profile["max_tokens"] = options.get("max-tokens", profile["max_tokens"])
+                profile["system_prompt"] = ai.get("system-prompt", profile["system_prompt"])
+                profile["source"] = config_file
+
+            except (OSError, yaml.YAMLError) as e:
+                print(f"⚠️  설정 파일 로드 실패 ({config_file}): {e}")
+
+        if "max_tokens" in config:
+            profile["max_tokens"] = config["max_tokens"]
+
+        return profile
+
+    def record_usage(self, message: str, ai_response: str, kind: str,
+                     latency: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        요청 1건의 토큰/비용 사용량 추정 및 기록
+
+        Args:
+            message: 전송한 사용자 메시지
+            ai_response: AI 응답 내용
+            kind: 요청 종류 ("context" 또는 "scenario")
+            latency: 응답 지연 시간 (ttfb_ms, ttft_ms, total_ms, streamed, sent_at)
+
+        Returns:
+            Dict: 요청 사용량
+        """
+        # 서버는 max-tokens 이상 응답할 수 없으므로 응답 및 이전 응답(히스토리) 추정치에
+        # 같은 상한 적용 (예산 추정 estimate_cell()과 일치)
+        prompt_tokens = estimate_prompt_tokens(
+            self.profile["system_prompt"],
+            self.conversation_history,
+            message,
+            self.profile["max_tokens"]
+        )
+        completion_tokens = min(estimate_tokens(ai_response), self.profile["max_tokens"])
+
+        usage = {
+            "kind": kind,
+            "response_length": len(ai_response),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "cost_usd": estimate_cost(prompt_tokens, completion_tokens, self.profile["model"])
+        }
+
+        if latency:
+            usage.update(latency)
+
+        self.conversation_history.append((message, ai_response))
+        self.request_usage.append(usage)
+        self.scheduler.charge(usage)
+
+        return usage
+
+    @staticmethod
+    def summarize_usage(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        요청별 사용량 합산
+
+        Args:
+            records: 요청 사용량 목록
+
+        Returns:
+            Dict: 합산 사용량
+        """
+        summary = {
+            "requests": len(records),
+            "response_length": sum(r["response_length"] for r in records),
+            "prompt_tokens": sum(r["prompt_tokens"] for r in records),
+            "completion_tokens": sum(r["completion_tokens"] for r in records),
+            "total_tokens": sum(r["total_tokens"] for r in records),
+            "cost_usd": round(sum(r["cost_usd"] for r in records), 6)
+        }
+
+        return summary
+
+    @staticmethod
+    def summarize_latency(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        요청별 지연 시간 집계 (평균, p95)
+
+        Args:
+            records: 요청 사용량 목록 (지연 시간 포함)
+
+        Returns:
+            Dict: 지표별 평균/p95 (ms)
+        """
+        timed = [r for r in records if "total_ms" in r]
+        summary = {
+            "requests": len(timed),
+            "streamed": sum(1 for r in timed if r.get("streamed"))
+        }
+
+        for metric in ["ttfb_ms", "ttft_ms", "total_ms"]:
+            values = [r[metric] for r in timed if r.get(metric) is not None]
+            summary[metric] = {
+                "avg": round(sum(values) / len(values), 1) if values else None,
+                "p95": round(percentile(values, 95), 1) if values else None
+            }
+
+        return summary
+
     def setup_test_user(self) -> bool:
         """
         테스트용 회원 가입 및 로그인
@@ -64,10 +881,11 @@ class AIResponseComparisonTest:
             print(f"👤 테스트 사용자 생성 중... (Email: {email})")
 
             # 1. 회원가입
-            response = requests.post(
+            response = self.breaker.request(
+                "POST",
                 f"{self.base_url}/api/join",
                 json=signup_data,
-                timeout=10
+                timeout=(CONNECT_TIMEOUT, 10)
             )
 
             if response.status_code != 200:
@@ -83,10 +901,11 @@ class AIResponseComparisonTest:
                 "memberPassword": password
             }
 
-            login_response = requests.post(
+            login_response = self.breaker.request(
+                "POST",
                 f"{self.base_url}/api/auth/login",
                 json=login_data,
-                timeout=10
+                timeout=(CONNECT_TIMEOUT, 10)
             )
 
             if login_response.status_code == 200:
@@ -99,6 +918,10 @@ class AIResponseComparisonTest:
                 print(f"   응답: {login_response.text}")
                 return False
 
+        except CircuitOpenError:
+            print("🔌 서버 장애로 테스트 사용자 생성 생략")
+            return False
+
         except Exception as e:
             print(f"❌ 오류 발생: {e}")
             return False
@@ -165,16 +988,20 @@ class AIResponseComparisonTest:
 
         return scenarios
 
-    def send_message(self, message: str) -> Dict[str, Any]:
+    def send_message(self, message: str, kind: str = "scenario") -> Dict[str, Any]:
         """
         대화 메시지 전송
 
         Args:
             message: 전송할 메시지
+            kind: 사용량 기록용 요청 종류 ("context" 또는 "scenario")
 
         Returns:
             Dict: API 응답 데이터
         """
+        if self.stream:
+            return self.send_message_stream(message, kind)
+
         headers = {
             "Authorization": f"Bearer {self.access_token}",
             "Content-Type": "application/json"
@@ -183,20 +1010,191 @@ class AIResponseComparisonTest:
         data = {"content": message}
 
         try:
-            response = requests.post(
+            sent_at = time.time()
+            start = time.perf_counter()
+            response = self.breaker.request(
+                "POST",
                 f"{self.base_url}/api/conversations/messages",
                 headers=headers,
                 json=data,
-                timeout=30  # OpenAI API 호출 시간 고려
+                timeout=(CONNECT_TIMEOUT, 30)  # OpenAI API 호출 시간 고려
             )
+            total_ms = (time.perf_counter() - start) * 1000
 
             if response.status_code == 200:
-                return response.json()["data"]
+                result = response.json()["data"]
+                # 일반 모드에서는 전체 응답 수신 후에야 텍스트가 표시됨 (TTFT = 전체 시간)
+                latency = {
+                    "ttfb_ms": round(response.elapsed.total_seconds() * 1000, 1),
+                    "ttft_ms": round(total_ms, 1),
+                    "total_ms": round(total_ms, 1),
+                    "streamed": False,
+                    "sent_at": sent_at
+                }
+                self.record_usage(message, result["aiMessage"]["content"], kind, latency)
+                return result
             else:
                 print(f"⚠️  메시지 전송 실패: {response.status_code}")
                 print(f"   응답: {response.text}")
                 return None
 
+        except CircuitOpenError:
+            print("🔌 서버 장애로 메시지 전송 생략")
+            return None
+
+        except Exception as e:
+            print(f"❌ 메시지 전송 오류: {e}")
+            return None
+
+    def send_message_stream(self, message: str, kind: str = "scenario") -> Dict[str, Any]:
+        """
+        대화 메시지 전송 (스트리밍 응답)
+
+        SSE(text/event-stream) 또는 chunked 응답을 수신하면서 AI 응답을 조립하고
+        첫 바이트(TTFB), 첫 토큰(TTFT), 전체 수신 시간을 측정합니다.
+        서버가 일반 JSON으로 응답하면 그대로 처리합니다.
+
+        SSE data 형식:
+            - {"content": "..."}: AI 응답 조각
+            - {"data": {...}} 또는 {"aiMessage": ...}: 최종 응답 (userMessage 포함)
+            - [DONE]: 스트림 종료
+            - 그 외 (JSON 객체가 아닌 값: 문자열, 숫자, true 등): 원문 그대로 AI 응답 조각
+
+        Args:
+            message: 전송할 메시지
+            kind: 사용량 기록용 요청 종류 ("context" 또는 "scenario")
+
+        Returns:
+            Dict: API 응답 데이터 (aiMessage.content는 수신한 조각을 이어붙인 값)
+        """
+        headers = {
+            "Authorization": f"Bearer {self.access_token}",
+            "Content-Type": "application/json",
+            "Accept": "text/event-stream, application/json"
+        }
+
+        data = {"content": message}
+
+        try:
+            sent_at = time.time()
+            start = time.perf_counter()
+            response = self.breaker.request(
+                "POST",
+                f"{self.base_url}/api/conversations/messages",
+                headers=headers,
+                json=data,
+                stream=True,
+                timeout=(CONNECT_TIMEOUT, 30)  # 청크 간 대기 시간
+            )
+
+            with response:
+                if response.status_code != 200:
+                    print(f"⚠️  메시지 전송 실패: {response.status_code}")
+                    print(f"   응답: {response.text}")
+                    return None
+
+                content_type = response.headers.get("Content-Type", "")
+                is_sse = "text/event-stream" in content_type
+                is_json = "application/json" in content_type
+
+                ttfb_ms = None
+                ttft_ms = None
+                buffer = b""
+                body = b""
+                pieces = []
+                final = None
+
+                # 헤더 수신 후 본문 스트리밍 중 연결이 끊겨도 장애로 집계
+                try:
+                    for chunk in response.iter_content(chunk_size=STREAM_READ_SIZE):
+                        if not chunk:
+                            continue
+
+                        elapsed_ms = (time.perf_counter() - start) * 1000
+                        if ttfb_ms is None:
+                            ttfb_ms = elapsed_ms
+
+                        if is_json:
+                            body += chunk
+                            continue
+
+                        if not is_sse:
+                            # 일반 chunked 텍스트: 청크를 그대로 이어붙임
+                            buffer += chunk
+                            if chunk.strip() and ttft_ms is None:
+                                ttft_ms = elapsed_ms
+                            continue
+
+                        buffer += chunk.replace(b"\r\n", b"\n")
+                        if buffer.endswith(b"\r\n"):  # 청크 경계에서 나뉜 CRLF
+                            buffer = buffer[:-2] + b"\n"
+
+                        while b"\n\n" in buffer:
+                            raw, buffer = buffer.split(b"\n\n", 1)
+                            event = decode_sse_event(raw.decode("utf-8"))
+
+                            if event is None:
+                                continue
+
+                            if "final" in event:
+                                final = event["final"]
+                            else:
+                                pieces.append(event["content"])
+                                if ttft_ms is None:
+                                    ttft_ms = elapsed_ms
+
+                except requests.RequestException as e:
+                    self.breaker.record_failure("connection")
+                    print(f"❌ 스트리밍 응답 수신 오류: {e}")
+                    return None
+
+                total_ms = (time.perf_counter() - start) * 1000
+
+                # 마지막 빈 줄 없이 끝난 이벤트 처리
+                if is_sse and buffer.strip():
+                    event = decode_sse_event(buffer.decode("utf-8"))
+
+                    if event is not None and "final" in event:
+                        final = event["final"]
+                    elif event is not None:
+                        pieces.append(event["content"])
+                        if ttft_ms is None:
+                            ttft_ms = total_ms
+
+            if is_json:
+                final = json.loads(body.decode("utf-8"))["data"]
+                pieces = [final["aiMessage"]["content"]]
+                ttft_ms = total_ms
+            elif not is_sse:
+                pieces = [buffer.decode("utf-8")]
+
+            final = final or {}
+            ai_content = "".join(pieces) or final.get("aiMessage", {}).get("content", "")
+
+            if not ai_content:
+                print("⚠️  스트리밍 응답에 AI 메시지가 없습니다.")
+                return None
+
+            result = {
+                "userMessage": final.get("userMessage", {"content": message, "emotion": None}),
+                "aiMessage": dict(final.get("aiMessage", {}), content=ai_content)
+            }
+
+            latency = {
+                "ttfb_ms": round(ttfb_ms, 1) if ttfb_ms is not None else None,
+                "ttft_ms": round(ttft_ms if ttft_ms is not None else total_ms, 1),
+                "total_ms": round(total_ms, 1),
+                "streamed": is_sse or not is_json,
+                "sent_at": sent_at
+            }
+            self.record_usage(message, ai_content, kind, latency)
+
+            return result
+
+        except CircuitOpenError:
+            print("🔌 서버 장애로 메시지 전송 생략")
+            return None
+
         except Exception as e:
             print(f"❌ 메시지 전송 오류: {e}")
             return None
@@ -216,7 +1214,7 @@ class AIResponseComparisonTest:
         for i, msg in enumerate(context_messages, 1):
             if msg["role"] == "user":
                 print(f"     [{i}] 사용자: {msg['message']}")
-                response = self.send_message(msg["message"])
+                response = self.send_message(msg["message"], kind="context")
 
                 if response:
                     ai_msg = response["aiMessage"]["content"]
@@ -244,6 +1242,9 @@ class AIResponseComparisonTest:
         if not self.setup_test_user():
             return None
 
+        self.conversation_history = []
+        usage_start = len(self.request_usage)
+
         # 컨텍스트 구축
         if scenario["context"]:
             self.build_conversation_context(scenario["context"])
@@ -272,18 +1273,25 @@ class AIResponseComparisonTest:
             "ai_response": ai_msg["content"],
             "expected_elements": scenario["expected_elements"],
             "has_context": len(scenario["context"]) > 0,
+            "usage": self.summarize_usage(self.request_usage[usage_start:]),
+            "requests": self.request_usage[usage_start:],
             "timestamp": datetime.now().isoformat()
         }
 
         return result
 
-    def test_all_scenarios_with_config(self, config_name: str, config_description: str) -> Dict[str, Any]:
+    def test_all_scenarios_with_config(self, config_name: str, config_description: str,
+                                       profile: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         특정 설정으로 모든 시나리오 테스트
 
+        예산이 설정된 경우 추정 비용이 낮은 시나리오부터 실행하고,
+        남은 예산으로 다음 시나리오를 실행할 수 없으면 중단합니다.
+
         Args:
             config_name: 설정 이름
             config_description: 설정 설명
+            profile: 토큰 추정용 설정 정보 (load_profile_settings() 결과)
 
         Returns:
             Dict: 전체 테스트 결과
@@ -293,24 +1301,93 @@ class AIResponseComparisonTest:
         print(f"📝 설명: {config_description}")
         print(f"{'='*70}")
 
-        scenarios = self.load_scenarios()
+        if profile is not None:
+            self.profile = profile
+
+        scenarios = self.scheduler.prioritize(self.load_scenarios(), self.profile)
         config_results = {
             "config_name": config_name,
             "config_description": config_description,
+            "profile_source": self.profile["source"],
             "scenarios": [],
             "test_time": datetime.now().isoformat()
         }
 
-        for scenario in scenarios:
-            result = self.test_scenario(scenario, config_name)
+        # 실패/재시도된 시나리오의 요청도 비용이 발생하므로 설정 실행 중 기록된 모든 요청을 집계
+        usage_start = len(self.request_usage)
 
-            if result:
-                config_results["scenarios"].append(result)
-                time.sleep(2)  # API 호출 간격 (과부하 방지)
-            else:
-                print(f"  ❌ 시나리오 {scenario['id']} 테스트 실패")
+        if self.metrics_sampler:
+            self.metrics_sampler.start()
 
-        print(f"\n✅ [{config_name}] 테스트 완료: {len(config_results['scenarios'])}/5개 성공")
+        try:
+            for index, scenario in enumerate(scenarios):
+                estimate = self.scheduler.estimate_cell(scenario, self.profile)
+
+                if not self.scheduler.can_afford(estimate):
+                    print(f"\n💸 예산 소진: 남은 시나리오 {len(scenarios) - index}개를 건너뜁니다.")
+                    for skipped in scenarios[index:]:
+                        self.scheduler.skip(config_name, skipped)
+                    break
+
+                # 서버 장애 시 복구될 때까지 대기 후 시나리오 재시도
+                if not self.breaker.wait_until_healthy():
+                    print(f"\n🔌 서버 미복구: 남은 시나리오 {len(scenarios) - index}개를 중단합니다.")
+                    break
+
+                result = self.test_scenario(scenario, config_name)
+
+                # 서버 장애(연결 실패/타임아웃, 헬스 체크 실패)로 실패한 경우에만 복구 후 재시도
+                # (차단 임계치 미만이어도 포함)
+                retries = 0
+                recovered = True
+                affordable = True
+                while not result and retries < MAX_SCENARIO_RETRIES and self.breaker.should_retry():
+                    if not self.breaker.wait_until_healthy():
+                        recovered = False
+                        break
+
+                    # 재시도 시 컨텍스트 메시지부터 다시 전송되므로 남은 예산으로 재확인
+                    if not self.scheduler.can_afford(self.scheduler.estimate_cell(scenario, self.profile)):
+                        print(f"  💸 예산 부족: 시나리오 {scenario['id']} 재시도를 건너뜁니다.")
+                        self.scheduler.skip(config_name, scenario)
+                        affordable = False
+                        break
+
+                    retries += 1
+                    print(f"  🔁 시나리오 {scenario['id']} 재시도 ({retries}/{MAX_SCENARIO_RETRIES})")
+                    result = self.test_scenario(scenario, config_name)
+
+                if not recovered:
+                    print(f"\n🔌 서버 미복구: 남은 시나리오 {len(scenarios) - index}개를 중단합니다.")
+                    break
+
+                if not affordable:
+                    continue
+
+                if result:
+                    config_results["scenarios"].append(result)
+                    time.sleep(2)  # API 호출 간격 (과부하 방지)
+                else:
+                    print(f"  ❌ 시나리오 {scenario['id']} 테스트 실패")
+
+        finally:
+            if self.metrics_sampler:
+                samples = self.metrics_sampler.stop()
+                config_results["server_metrics"] = {
+                    "interval_s": self.metrics_sampler.interval,
+                    "samples": samples,
+                    "summary": MetricsSampler.summarize(samples)
+                }
+
+        # 보고서 비교를 위해 시나리오 ID 순으로 정렬
+        config_results["scenarios"].sort(key=lambda r: r["scenario_id"])
+        config_requests = self.request_usage[usage_start:]
+        config_results["usage"] = self.summarize_usage(config_requests)
+        config_results["latency"] = self.summarize_latency(config_requests)
+
+        print(f"\n✅ [{config_name}] 테스트 완료: {len(config_results['scenarios'])}/{len(scenarios)}개 성공")
+        print(f"💰 추정 사용량: {config_results['usage']['total_tokens']} 토큰, "
+              f"${config_results['usage']['cost_usd']:.4f}")
 
         return config_results
 
@@ -339,29 +1416,47 @@ class AIResponseComparisonTest:
 
         # 테스트할 설정 목록 (improved1 기반 개선 버전 비교)
         # test 프로필 사용 (H2 인메모리 DB, 빠른 시작)
+        # config_file: 토큰/비용 추정에 사용할 설정 파일
+        # (v2, v3는 별도 설정 파일이 없어 improved1 프롬프트로 근사)
         configs = [
             {
                 "name": "improved1",
                 "description": "Improved1 (이전 최고 성능, 73.3%) - 비교 기준",
                 "profile": "ai-improved1",
+                "config_file": "config/improved_prompt_config.yml",
                 "command": f"{gradle_cmd} bootRun --args='--spring.profiles.active=test,ai,ai-improved1'"
             },
             {
                 "name": "improved1-v2",
                 "description": "Improved1 v2: 부정적 감정 + 건강 대화 프롬프트 강화",
                 "profile": "ai-improved1-v2",
+                "config_file": "config/improved_prompt_config.yml",
                 "command": f"{gradle_cmd} bootRun --args='--spring.profiles.active=test,ai,ai-improved1-v2'"
             },
             {
                 "name": "improved1-v3",
                 "description": "Improved1 v3: v2 + Temperature 0.8 + max-tokens 120",
                 "profile": "ai-improved1-v3",
+                "config_file": "config/improved_prompt_config.yml",
+                "max_tokens": 120,
                 "command": f"{gradle_cmd} bootRun --args='--spring.profiles.active=test,ai,ai-improved1-v3'"
             }
         ]
 
         # 각 설정별 테스트
         for i, config in enumerate(configs, 1):
+            profile = self.load_profile_settings(config)
+
+            # 남은 예산으로 가장 저렴한 시나리오도 실행할 수 없으면 서버 재시작 없이 종료
+            scenarios = self.load_scenarios()
+            affordable = [s for s in scenarios if self.scheduler.can_afford(self.scheduler.estimate_cell(s, profile))]
+            if not affordable:
+                print(f"\n💸 예산 소진: [{config['name']}] 이후 설정 테스트를 건너뜁니다.")
+                for skipped_config in configs[i - 1:]:
+                    for scenario in scenarios:
+                        self.scheduler.skip(skipped_config["name"], scenario)
+                break
+
             print(f"\n{'#'*70}")
             print(f"# 진행 상황: {i}/{len(configs)}")
             print(f"{'#'*70}")
@@ -391,12 +1486,16 @@ class AIResponseComparisonTest:
             # 테스트 실행
             config_result = self.test_all_scenarios_with_config(
                 config["name"],
-                config["description"]
+                config["description"],
+                profile
             )
 
             if config_result:
                 self.results["configurations"].append(config_result)
 
+        self.results["budget"] = self.scheduler.summary()
+        self.results["outages"] = self.breaker.outages
+
         # 결과 저장
         self.save_results()
 
@@ -431,8 +1530,6 @@ class AIResponseComparisonTest:
         Returns:
             tuple: (점수, 별점 문자열)
         """
-        import re
-
         score = 0.0
         max_score = len(expected_elements)
 
@@ -559,6 +1656,70 @@ class AIResponseComparisonTest:
 
         return score, stars
 
+    def write_server_metrics_section(self, f) -> None:
+        """
+        서버 지표 섹션 작성 (클라이언트 지연 시간과 나란히 비교)
+
+        Args:
+            f: 보고서 파일 객체
+        """
+        f.write("\n### 🖥️ 서버 지표 vs 클라이언트 지연 시간\n\n")
+        f.write("서버 처리 시간이 클라이언트 전체 시간의 대부분이면 서버(또는 OpenAI) 병목, ")
+        f.write("차이가 크면 하네스/네트워크 병목으로 판단합니다.\n\n")
+        f.write("| 설정 | 클라이언트 전체 시간 평균 / p95 | 서버 처리 시간 평균 | 서버 처리 최대 | 서버 비중 |\n")
+        f.write("|------|--------------------------------|---------------------|----------------|-----------|\n")
+
+        for config in self.results["configurations"]:
+            server_metrics = config.get("server_metrics")
+            latency = config.get("latency")
+            if not server_metrics or not latency or latency["total_ms"]["avg"] is None:
+                continue
+
+            # 대화 API 타이머 (http.server.requests) 찾기
+            timer = None
+            for endpoint, entry in server_metrics["summary"].items():
+                if "http.server.requests" in endpoint and "avg_time_ms" in entry:
+                    timer = entry
+                    break
+
+            client = f"{latency['total_ms']['avg']:.0f}ms / {latency['total_ms']['p95']:.0f}ms"
+
+            if timer is None:
+                f.write(f"| **{config['config_name']}** | {client} | - | - | - |\n")
+                continue
+
+            server_avg = timer["avg_time_ms"]
+            server_max = timer["statistics"].get("MAX", {}).get("max")
+            server_max_text = f"{server_max * 1000:.0f}ms" if server_max is not None else "-"
+            share = server_avg / latency["total_ms"]["avg"] * 100
+
+            f.write(f"| **{config['config_name']}** | {client} | {server_avg:.0f}ms | ")
+            f.write(f"{server_max_text} | {share:.0f}% |\n")
+
+        f.write("\n#### 수집된 서버 지표\n\n")
+        f.write("| 설정 | 지표 | 통계 | 최소 | 최대 | 변화량 | 샘플 (오류) |\n")
+        f.write("|------|------|------|------|------|--------|-------------|\n")
+
+        for config in self.results["configurations"]:
+            server_metrics = config.get("server_metrics")
+            if not server_metrics:
+                continue
+
+            for endpoint, entry in server_metrics["summary"].items():
+                metric_name = endpoint.replace("/actuator/metrics/", "")
+
+                if not entry["statistics"]:
+                    f.write(f"| **{config['config_name']}** | `{metric_name}` | - | - | - | - | ")
+                    f.write(f"{entry['samples']} ({entry['errors']}) |\n")
+                    continue
+
+                for statistic, stats in entry["statistics"].items():
+                    f.write(f"| **{config['config_name']}** | `{metric_name}` | {statistic} | ")
+                    f.write(f"{stats['min']:.4g} | {stats['max']:.4g} | {stats['delta']:.4g} | ")
+                    f.write(f"{entry['samples']} ({entry['errors']}) |\n")
+
+        f.write("\n")
+
     def generate_report(self) -> None:
         """Markdown 비교 보고서 생성"""
         output_dir = Path(__file__).parent / "output"
@@ -610,8 +1771,11 @@ class AIResponseComparisonTest:
                     f.write("|------|---------|-----------|-----------|------|\n")
 
                     for config in self.results["configurations"]:
-                        if i < len(config["scenarios"]):
-                            scenario = config["scenarios"][i]
+                        # 예산 소진으로 설정마다 실행된 시나리오가 다를 수 있어 ID로 매칭
+                        matched = [s for s in config["scenarios"]
+                                   if s["scenario_id"] == first_scenario["scenario_id"]]
+                        if matched:
+                            scenario = matched[0]
                             score, stars = self.evaluate_response(
                                 scenario["ai_response"],
                                 scenario["expected_elements"]
@@ -664,6 +1828,57 @@ class AIResponseComparisonTest:
                 f.write(f"{total_score:.1f}/{total_max} ({avg_ratio*100:.1f}%) | ")
                 f.write(f"{avg_stars} |\n")
 
+            # 토큰 및 비용
+            f.write("\n### 💰 설정별 토큰 및 비용 (추정)\n\n")
+            f.write("| 설정 | 요청 수 | 평균 응답 길이 | 프롬프트 토큰 | 응답 토큰 | 총 토큰 | 추정 비용 |\n")
+            f.write("|------|---------|----------------|---------------|-----------|---------|-----------|\n")
+
+            for config in self.results["configurations"]:
+                usage = config.get("usage")
+                if not usage:
+                    continue
+
+                avg_length = usage["response_length"] / usage["requests"] if usage["requests"] > 0 else 0
+
+                f.write(f"| **{config['config_name']}** | ")
+                f.write(f"{usage['requests']} | ")
+                f.write(f"{avg_length:.1f}자 | ")
+                f.write(f"{usage['prompt_tokens']} | ")
+                f.write(f"{usage['completion_tokens']} | ")
+                f.write(f"{usage['total_tokens']} | ")
+                f.write(f"${usage['cost_usd']:.4f} |\n")
+
+            budget = self.results.get("budget")
+            if budget and (budget["token_budget"] is not None or budget["cost_budget_usd"] is not None):
+                token_limit = budget["token_budget"] if budget["token_budget"] is not None else "제한 없음"
+                cost_limit = f"${budget['cost_budget_usd']:.4f}" if budget["cost_budget_usd"] is not None else "제한 없음"
+                f.write(f"\n**예산**: 토큰 {token_limit}, 비용 {cost_limit}\n\n")
+                f.write(f"**사용량**: {budget['spent_tokens']} 토큰, ${budget['spent_cost_usd']:.4f}\n\n")
+                if budget["exhausted"]:
+                    f.write(f"**⚠️ 예산 소진으로 건너뛴 테스트**: {len(budget['skipped_cells'])}회\n\n")
+
+            # 응답 지연 시간
+            f.write("\n### ⏱️ 설정별 응답 지연 시간\n\n")
+            f.write(f"**응답 모드**: {'스트리밍' if self.results.get('response_mode') == 'stream' else '일반 (전체 응답 대기)'}\n\n")
+            f.write("| 설정 | 요청 수 | TTFB 평균 / p95 | 첫 토큰(TTFT) 평균 / p95 | 전체 시간 평균 / p95 |\n")
+            f.write("|------|---------|-----------------|--------------------------|----------------------|\n")
+
+            for config in self.results["configurations"]:
+                latency = config.get("latency")
+                if not latency or not latency["requests"]:
+                    continue
+
+                cells = []
+                for metric in ["ttfb_ms", "ttft_ms", "total_ms"]:
+                    stats = latency[metric]
+                    cells.append("-" if stats["avg"] is None else f"{stats['avg']:.0f}ms / {stats['p95']:.0f}ms")
+
+                f.write(f"| **{config['config_name']}** | {latency['requests']} | {' | '.join(cells)} |\n")
+
+            # 서버 지표
+            if any(config.get("server_metrics") for config in self.results["configurations"]):
+                self.write_server_metrics_section(f)
+
             f.write("\n### 설정별 특징 분석\n\n")
             f.write("| 설정 | 장점 | 단점 |\n")
             f.write("|------|------|------|\n")
@@ -707,13 +1922,20 @@ class AIResponseComparisonTest:
             f.write("### 테스트 환경\n\n")
             f.write(f"- **서버**: {self.results['base_url']}\n")
             f.write(f"- **테스트 일시**: {self.results['test_date']}\n")
-            f.write(f"- **총 테스트 수**: {len(self.results['configurations'])} 설정 × 5 시나리오 = ")
-            f.write(f"{len(self.results['configurations']) * 5}회\n\n")
+            f.write(f"- **총 테스트 수**: {len(self.results['configurations'])} 설정, ")
+            f.write(f"{sum(len(c['scenarios']) for c in self.results['configurations'])}회 성공\n")
+
+            outages = self.results.get("outages", [])
+            if outages:
+                downtime = sum(o["downtime_s"] for o in outages)
+                f.write(f"- **서버 장애**: {len(outages)}회, 총 {downtime:.1f}초 대기\n")
+            f.write("\n")
 
             f.write("### 평가 방법\n\n")
             f.write("- **자동 평가**: 키워드 기반 휴리스틱 매칭\n")
             f.write("- **평가 기준**: 각 시나리오별 기대 요소 충족 여부\n")
-            f.write("- **별점 산정**: 충족률에 따른 5단계 평가\n\n")
+            f.write("- **별점 산정**: 충족률에 따른 5단계 평가\n")
+            f.write("- **토큰 추정**: 시스템 프롬프트 + 최근 5턴 대화 + 사용자 메시지 기준 근사치 (한글 1음절 ≈ 1토큰)\n\n")
 
         print(f"📄 보고서 생성 완료: {report_file}")
         print(f"\n📖 보고서 확인 방법:")
@@ -723,6 +1945,23 @@ class AIResponseComparisonTest:
 
 def main():
     """메인 함수"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AI 응답 개선 비교 테스트")
+    parser.add_argument("--token-budget", type=int, default=None,
+                        help="전체 토큰 예산 (초과 전 테스트 중단)")
+    parser.add_argument("--cost-budget", type=float, default=None,
+                        help="전체 비용 예산 USD (초과 전 테스트 중단)")
+    parser.add_argument("--stream", action="store_true",
+                        help="스트리밍 응답 모드 (첫 토큰까지의 시간 측정)")
+    parser.add_argument("--metrics-interval", type=float, default=DEFAULT_METRICS_INTERVAL,
+                        help="서버 지표 수집 간격 초 (0이면 수집 안 함)")
+    parser.add_argument("--recovery-timeout", type=float, default=RECOVERY_TIMEOUT,
+                        help="서버 장애 시 복구 대기 최대 시간 초")
+    parser.add_argument("--metrics-endpoint", action="append", default=None,
+                        help="수집할 Actuator 경로 (여러 번 지정 가능, 기본값: JVM 힙/HTTP 요청/커넥션 풀)")
+    args = parser.parse_args()
+
     print("="*70)
     print(" AI 응답 개선 비교 테스트 자동화 스크립트")
     print(" MARUNI Project - Conversation Domain")
@@ -730,7 +1969,15 @@ def main():
     print()
 
     # 테스트 인스턴스 생성
-    tester = AIResponseComparisonTest(base_url="http://localhost:8080")
+    tester = AIResponseComparisonTest(
+        base_url="http://localhost:8080",
+        token_budget=args.token_budget,
+        cost_budget=args.cost_budget,
+        stream=args.stream,
+        metrics_endpoints=args.metrics_endpoint,
+        metrics_interval=args.metrics_interval,
+        recovery_timeout=args.recovery_timeout
+    )
 
     # 전체 비교 테스트 실행
     tester.run_comparison_test()
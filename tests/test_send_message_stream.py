@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+스트리밍 응답 모드 테스트
+
+로컬 대체 서버가 SSE(chunked / Connection: close), chunked 텍스트, JSON으로 응답할 때
+send_message_stream()의 응답 조립과 TTFB/TTFT 측정을 확인합니다.
+
+실행: python -m unittest discover -s tests
+"""
+
+import json
+import sys
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_response_comparison_test import AIResponseComparisonTest  # noqa: E402
+
+# 이벤트 사이 지연 (초)
+EVENT_DELAY = 0.3
+
+FINAL_DATA = {
+    "userMessage": {"content": "시험 결과가 좋게 나왔대요", "emotion": "POSITIVE"},
+    "aiMessage": {"content": "", "emotion": "NEUTRAL"}
+}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """대화 API 대체 서버 (경로로 응답 방식 선택)"""
+
+    protocol_version = "HTTP/1.1"
+
+    # 경로별 응답 본문 조각 목록 (서버 시작 시 설정)
+    bodies = {}
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+
+        mode, pieces = self.bodies[self.path]
+
+        if mode == "json":
+            body = pieces[0]
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        content_type = "text/event-stream" if mode.startswith("sse") else "text/plain; charset=utf-8"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+
+        if mode == "sse-close":
+            # Content-Length 없이 연결 종료로 본문 끝을 알림
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for piece in pieces:
+                self.wfile.write(piece)
+                self.wfile.flush()
+                time.sleep(EVENT_DELAY)
+            self.close_connection = True
+            return
+
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for piece in pieces:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(piece), piece))
+            self.wfile.flush()
+            time.sleep(EVENT_DELAY)
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def sse(data) -> bytes:
+    """SSE 이벤트 1개 (data가 문자열이 아니면 JSON 직렬화)"""
+    if not isinstance(data, str):
+        data = json.dumps(data, ensure_ascii=False)
+    return f"data: {data}\n\n".encode("utf-8")
+
+
+class SendMessageStreamTest(unittest.TestCase):
+    """send_message_stream() 테스트"""
+
+    @classmethod
+    def setUpClass(cls):
+        StandInHandler.bodies = {
+            "/raw": ("sse-chunked", [
+                b": keep-alive\n\n",
+                sse("손자가"),
+                sse("3"),
+                sse("등을"),
+                sse({"data": FINAL_DATA}),
+            ]),
+            "/close": ("sse-close", [
+                sse({"content": "축하"}),
+                sse({"content": "드려요!"}),
+                # 마지막 이벤트는 빈 줄 없이 종료
+                ("data: " + json.dumps({"data": FINAL_DATA}, ensure_ascii=False)).encode("utf-8"),
+            ]),
+            "/text": ("text-chunked", ["정말 ".encode("utf-8"), "잘됐네요".encode("utf-8")]),
+            "/json": ("json", [json.dumps({"data": dict(
+                FINAL_DATA, aiMessage={"content": "정말 기쁘시겠어요!", "emotion": "NEUTRAL"}
+            )}, ensure_ascii=False).encode("utf-8")]),
+        }
+
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def send(self, path: str):
+        """대체 서버의 path로 스트리밍 요청 전송"""
+        tester = AIResponseComparisonTest(
+            base_url=f"http://127.0.0.1:{self.server.server_address[1]}",
+            stream=True,
+            metrics_interval=0
+        )
+        tester.access_token = "token"
+
+        # 경로별 응답 방식을 고르기 위해 요청 URL만 교체
+        request = tester.breaker.request
+        tester.breaker.request = lambda method, url, **kwargs: request(
+            method, url.replace("/api/conversations/messages", path), **kwargs
+        )
+
+        result = tester.send_message("시험 결과가 좋게 나왔대요")
+        return result, tester.request_usage[-1] if tester.request_usage else None
+
+    def test_raw_token_payloads_are_kept(self):
+        result, usage = self.send("/raw")
+
+        self.assertEqual(result["aiMessage"]["content"], "손자가3등을")
+        self.assertEqual(result["userMessage"]["emotion"], "POSITIVE")
+        self.assertTrue(usage["streamed"])
+        self.assertLess(usage["ttfb_ms"], usage["ttft_ms"])
+        self.assertLess(usage["ttft_ms"], usage["total_ms"] - EVENT_DELAY * 1000)
+
+    def test_connection_close_stream_measures_first_token(self):
+        result, usage = self.send("/close")
+
+        self.assertEqual(result["aiMessage"]["content"], "축하드려요!")
+        self.assertEqual(result["userMessage"]["emotion"], "POSITIVE")
+        self.assertLess(usage["ttfb_ms"], EVENT_DELAY * 1000)
+        self.assertLess(usage["ttft_ms"], usage["total_ms"] - EVENT_DELAY * 1000)
+
+    def test_chunked_text_is_assembled(self):
+        result, usage = self.send("/text")
+
+        self.assertEqual(result["aiMessage"]["content"], "정말 잘됐네요")
+        self.assertLess(usage["ttft_ms"], usage["total_ms"] - EVENT_DELAY * 1000)
+
+    def test_json_response_falls_back_to_blocking(self):
+        result, usage = self.send("/json")
+
+        self.assertEqual(result["aiMessage"]["content"], "정말 기쁘시겠어요!")
+        self.assertFalse(usage["streamed"])
+        self.assertEqual(usage["ttft_ms"], usage["total_ms"])
+
+
+if __name__ == "__main__":
+    unittest.main()